@@ -0,0 +1,136 @@
+import json
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, TypedDict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.expanduser("~/.cache/spotify_radar/albums.json")
+
+
+class MinimalAlbum(TypedDict):
+    """The album fields the radar actually reads, only these are written to disk"""
+
+    id: str
+    name: str
+    release_date: str
+    release_date_precision: str
+    album_group: str
+
+
+@dataclass(frozen=True)
+class ColdCutoffs:
+    """When a cached artist counts as cold, fixed once at the start of a run
+
+    A cold artist released nothing since inactive_since (YYYY-MM-DD) and was
+    last checked after checked_since. checked_at is recorded for the artists
+    checked in this run.
+    """
+
+    inactive_since: str
+    checked_since: str
+    checked_at: str
+
+    @classmethod
+    def for_run(
+        cls, date_threshold: str, cold_after_days: int, recheck_hours: int
+    ) -> "ColdCutoffs":
+        """Compute the cutoffs for a run looking for releases since date_threshold"""
+        now = datetime.now()
+        inactive_since = (now.date() - timedelta(days=cold_after_days)).isoformat()
+        return cls(
+            inactive_since=min(date_threshold, inactive_since),
+            checked_since=(now - timedelta(hours=recheck_hours)).isoformat(
+                timespec="seconds"
+            ),
+            checked_at=now.isoformat(timespec="seconds"),
+        )
+
+
+class AlbumCache:
+    """Keeps the albums of every artist between runs in a JSON file"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+
+        try:
+            with open(path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable album cache %s: %s", path, e)
+
+    def get(self, artist_id: str) -> Optional[Dict]:
+        """Get the cached entry of an artist, if any"""
+        return self.entries.get(artist_id)
+
+    def set(
+        self,
+        artist_id: str,
+        albums: List[Dict],
+        total: int,
+        latest: str,
+        since: str,
+        checked_at: str,
+    ) -> None:
+        """Store the albums of an artist along with what is needed to validate them
+
+        total and latest are the album count and the id of the first album
+        Spotify reported, since is the oldest release date the albums cover and
+        checked_at when they were fetched.
+        """
+        self.entries[artist_id] = {
+            "total": total,
+            "latest": latest,
+            "since": since,
+            "last_release": max(
+                (
+                    album["release_date"]
+                    for album in albums
+                    if album["release_date_precision"] == "day"
+                ),
+                default="",
+            ),
+            "checked": checked_at,
+            "albums": [minimal_album(album) for album in albums],
+        }
+
+    def touch(self, artist_id: str, checked_at: str) -> None:
+        """Record that the cached albums of an artist were confirmed at checked_at"""
+        self.entries[artist_id]["checked"] = checked_at
+
+    def is_cold(self, artist_id: str, cutoffs: ColdCutoffs) -> bool:
+        """Check if an artist has been inactive for long and was checked recently"""
+        entry = self.entries.get(artist_id)
+        if entry is None or not entry.get("last_release") or not entry.get("checked"):
+            return False
+        return (
+            entry["last_release"] < cutoffs.inactive_since
+            and entry["checked"] >= cutoffs.checked_since
+        )
+
+    def save(self) -> None:
+        """Write the cache to disk, a failure only costs the next run its cache"""
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning("Could not write album cache %s: %s", self.path, e)
+
+
+def minimal_album(album: Dict) -> MinimalAlbum:
+    """Strip an album returned by Spotify down to the fields the radar reads"""
+    return MinimalAlbum(
+        id=album["id"],
+        name=album["name"],
+        release_date=album["release_date"],
+        release_date_precision=album["release_date_precision"],
+        album_group=album.get("album_group", ""),
+    )
@@ -5,6 +5,7 @@ import os
 
 from dotenv import load_dotenv
 
+from spotify_radar.cache import DEFAULT_CACHE_PATH
 from spotify_radar.radar import SpotifyConfig, SpotifyReleaseRadar
 
 # Configure logging
@@ -34,10 +35,23 @@ def main():
         default=None,
         help="Optional path to a .env file with Spotify credentials",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not reuse or store the albums fetched in previous runs",
+    )
+    parser.add_argument(
+        "--requests-per-second",
+        type=float,
+        default=10,
+        help="Maximum number of Spotify API requests per second (default: 10)",
+    )
     parser.add_argument("--client-id", type=str, help="Spotify Client ID")
     parser.add_argument("--client-secret", type=str, help="Spotify Client Secret")
     parser.add_argument("--redirect-uri", type=str, help="Spotify Redirect URI")
     args = parser.parse_args()
+    if args.requests_per_second <= 0:
+        parser.error("--requests-per-second must be greater than 0")
 
     # Load .env if specified or exists
     if args.env_file:
@@ -58,7 +72,11 @@ def main():
         return
 
     config = SpotifyConfig(
-        client_id=client_id, client_secret=client_secret, redirect_uri=redirect_uri
+        client_id=client_id,
+        client_secret=client_secret,
+        redirect_uri=redirect_uri,
+        cache_path=None if args.no_cache else DEFAULT_CACHE_PATH,
+        requests_per_second=args.requests_per_second,
     )
 
     radar = SpotifyReleaseRadar(config)
@@ -74,8 +92,8 @@ def main():
     playlist = radar.create_and_populate_playlist(track_ids, args.days)
 
     if playlist:
-        logger.info(f"\nPlaylist created: {playlist['name']}")
-        logger.info(f"URL: {playlist['external_urls']['spotify']}")
+        logger.info("\nPlaylist created: %s", playlist["name"])
+        logger.info("URL: %s", playlist["external_urls"]["spotify"])
 
 
 if __name__ == "__main__":
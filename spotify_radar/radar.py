@@ -1,20 +1,32 @@
 import logging
 import os
-import time
-from dataclasses import dataclass
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from functools import cached_property
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import spotipy
 from dotenv import load_dotenv
 from spotipy.oauth2 import SpotifyOAuth
 
+from spotify_radar.cache import DEFAULT_CACHE_PATH, AlbumCache, ColdCutoffs
+from spotify_radar.session import RadarSession
+
 load_dotenv()
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(message)s")
 logger = logging.getLogger(__name__)
 
+# Fetches the next page of paginated results while the current one is consumed
+PREFETCH_WORKERS = 4
+_prefetch_executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS)
+
+# Looks up the tracks of new releases while the artists are still being checked
+COLLECTOR_WORKERS = 1
+
 
 @dataclass
 class SpotifyConfig:
@@ -25,20 +37,51 @@ class SpotifyConfig:
     redirect_uri: str
     scope: str = "user-follow-read playlist-modify-public"
     timeout: int = 20
-
-
-@dataclass
-class ReleaseInfo:
-    artist: str
-    track_name: str
-    album_name: str
-    release_date: str
-    track_url: str
+    max_workers: int = 10
+    cache_path: Optional[str] = DEFAULT_CACHE_PATH
+    requests_per_second: float = 10
+    retries: int = 3
+    backoff_factor: float = 1.0
+    # Restricting results to a market drops the long available_markets lists
+    market: Optional[str] = "from_token"
+    # Cached artists without releases for this long are only rechecked daily
+    cold_after_days: int = 180
+    cold_recheck_hours: int = 24
+
+
+@dataclass(slots=True)
+class ReleaseTable:
+    """Found tracks, stored as one list per column instead of one object per track"""
+
+    artist: List[str] = field(default_factory=list)
+    track_name: List[str] = field(default_factory=list)
+    album_name: List[str] = field(default_factory=list)
+    release_date: List[str] = field(default_factory=list)
+    track_url: List[str] = field(default_factory=list)
+
+    def append(
+        self,
+        artist: str,
+        track_name: str,
+        album_name: str,
+        release_date: str,
+        track_url: str,
+    ) -> None:
+        """Add a found track"""
+        self.artist.append(artist)
+        self.track_name.append(track_name)
+        self.album_name.append(album_name)
+        self.release_date.append(release_date)
+        self.track_url.append(track_url)
+
+    def __len__(self) -> int:
+        return len(self.track_name)
 
 
 class SpotifyReleaseRadar:
     def __init__(self, config: SpotifyConfig):
         """Initialize with Spotify configuration"""
+        self.config = config
         self.sp = spotipy.Spotify(
             auth_manager=SpotifyOAuth(
                 client_id=config.client_id,
@@ -46,112 +89,312 @@ class SpotifyReleaseRadar:
                 redirect_uri=config.redirect_uri,
                 scope=config.scope,
             ),
+            requests_session=RadarSession(
+                requests_per_second=config.requests_per_second,
+                retries=config.retries,
+                backoff_factor=config.backoff_factor,
+                pool_size=config.max_workers + PREFETCH_WORKERS + COLLECTOR_WORKERS,
+            ),
             requests_timeout=config.timeout,
         )
+        self.cache = AlbumCache(config.cache_path) if config.cache_path else None
+
+    @cached_property
+    def user_id(self) -> str:
+        """Id of the authenticated user, only looked up once"""
+        return self.sp.current_user()["id"]
 
-    def get_followed_artists(self) -> List[Dict]:
-        """Fetch all artists the user follows"""
+    def get_followed_artists(self) -> Iterator[Dict]:
+        """Fetch all artists the user follows, page by page"""
         logger.info("Fetching followed artists...")
-        artists = []
+        found = 0
         results = self.sp.current_user_followed_artists(limit=50)
 
         if "artists" not in results:
             logger.error("Unexpected API response format")
+            return
+
+        try:
+            for artist in self._paginate(results["artists"], key="artists"):
+                found += 1
+                if found % 50 == 0:
+                    logger.info("Found %d artists...", found)
+                yield artist
+        except spotipy.SpotifyException as e:
+            # Transient errors were already retried, a partial list is no use
+            logger.error("Error during pagination: %s", e)
+            raise
+
+        logger.info("Total artists followed: %d", found)
+
+    def _paginate(
+        self,
+        results: Dict,
+        key: Optional[str] = None,
+        stop: Optional[Callable[[List[Dict]], bool]] = None,
+    ) -> Iterator[Dict]:
+        """Yield the items of a page and all pages after it
+
+        The next page is fetched in the background while the items of the
+        current one are consumed. key unwraps pages nested in the response
+        (like followed artists), stop ends pagination after the given items.
+        """
+        while True:
+            prefetch = None
+            if results["next"] and not (stop and stop(results["items"])):
+                prefetch = _prefetch_executor.submit(self.sp.next, results)
+
+            yield from results["items"]
+
+            if prefetch is None:
+                return
+            results = prefetch.result()
+            if key is not None:
+                results = results[key]
+
+    def get_artist_albums(
+        self, artist_id: str, min_date: Optional[str] = None
+    ) -> Iterator[Dict]:
+        """Get all albums for an artist using pagination, bump limit if not all songs are shown
+
+        Spotify returns the albums first and the singles last, each group sorted
+        newest first. So once a page ends with a single older than min_date
+        (YYYY-MM-DD), none of the remaining pages can contain anything newer and
+        we stop paginating.
+        """
+        results = self.sp.artist_albums(
+            artist_id,
+            include_groups="album,single",
+            country=self.config.market,
+            limit=50,
+        )
+        yield from self._paginate(
+            results, stop=lambda items: self._is_past_min_date(items, min_date)
+        )
+
+    @staticmethod
+    def _is_past_min_date(items: List[Dict], min_date: Optional[str]) -> bool:
+        """Check if a page of artist albums ends with a single older than min_date"""
+        if min_date is None or not items:
+            return False
+        last = items[-1]
+        # ISO dates compare correctly as strings, only full dates are comparable
+        return (
+            last.get("album_group") == "single"
+            and last["release_date_precision"] == "day"
+            and last["release_date"] < min_date
+        )
+
+    def _get_cached_artist_albums(
+        self, artist_id: str, min_date: str, cutoffs: ColdCutoffs
+    ) -> List[Dict]:
+        """Get the albums of an artist, reusing the cached ones if nothing changed
+
+        A single one-album request tells whether the artist released anything
+        since the last run: if neither the album count nor the first album
+        changed, the cached albums are still complete. Artists that are cold
+        according to cutoffs are not requested at all.
+        """
+        if self.cache.is_cold(artist_id, cutoffs):
             return []
 
-        artists.extend(results["artists"]["items"])
-        logger.info(f"Found {len(artists)} artists...")
+        probe = self.sp.artist_albums(
+            artist_id,
+            include_groups="album,single",
+            country=self.config.market,
+            limit=1,
+        )
+        latest = probe["items"][0]["id"] if probe["items"] else ""
+
+        cached = self.cache.get(artist_id)
+        if (
+            cached is not None
+            and cached["total"] == probe["total"]
+            and cached["latest"] == latest
+            and cached["since"] <= min_date
+        ):
+            self.cache.touch(artist_id, cutoffs.checked_at)
+            return cached["albums"]
+
+        albums = list(self.get_artist_albums(artist_id, min_date=min_date))
+        self.cache.set(
+            artist_id, albums, probe["total"], latest, min_date, cutoffs.checked_at
+        )
+        return albums
+
+    def get_album_tracks(self, album_id: str) -> Iterator[Dict]:
+        """Get all tracks from an album"""
+        yield from self._paginate(
+            self.sp.album_tracks(album_id, market=self.config.market)
+        )
 
-        while results["artists"]["next"]:
-            try:
-                results = self.sp.next(results["artists"])
-                artists.extend(results["artists"]["items"])
-                logger.info(f"Found {len(artists)} artists...")
-            except Exception as e:
-                logger.error(f"Error during pagination: {e}")
-                break
-
-        logger.info(f"Total artists followed: {len(artists)}")
-        return artists
-
-    def get_artist_albums(self, artist_id: str) -> List[Dict]:
-        """Get all albums for an artist using pagination, bump limit if not all songs are shown"""
+    def get_albums_bulk(self, album_ids: List[str]) -> List[Dict]:
+        """Get full albums including their tracks, 20 albums per request"""
         albums = []
-        results = self.sp.artist_albums(artist_id, album_type="album,single", limit=50)
-        albums.extend(results["items"])
-
-        while results["next"]:
-            results = self.sp.next(results)
-            albums.extend(results["items"])
+        for i in range(0, len(album_ids), 20):
+            results = self.sp.albums(album_ids[i : i + 20], market=self.config.market)
+            albums.extend(results["albums"])
 
         return albums
 
-    def get_album_tracks(self, album_id: str) -> List[Dict]:
-        """Get all tracks from an album"""
-        tracks = []
-        results = self.sp.album_tracks(album_id)
-        tracks.extend(results["items"])
+    def _get_embedded_tracks(self, album: Dict) -> Iterator[Dict]:
+        """Get all tracks of a full album, only paginating for very long albums"""
+        yield from self._paginate(album["tracks"])
 
-        while results["next"]:
-            results = self.sp.next(results)
-            tracks.extend(results["items"])
+    def _artist_new_albums(
+        self, artist: Dict, date_threshold: str, cutoffs: ColdCutoffs
+    ) -> List[Dict]:
+        """Get the albums released by an artist since date_threshold (YYYY-MM-DD)"""
+        new_albums = []
+
+        albums: Iterable[Dict]
+        if self.cache is not None:
+            albums = self._get_cached_artist_albums(
+                artist["id"], date_threshold, cutoffs
+            )
+        else:
+            albums = self.get_artist_albums(artist["id"], min_date=date_threshold)
+        albums = sorted(albums, key=lambda album: album["release_date"], reverse=True)
+
+        for album in albums:
+            if album["release_date_precision"] != "day":
+                continue  # Only the year or month is known
+            if album["release_date"] < date_threshold:
+                break  # Sorted newest first, everything after this is older
+            new_albums.append(album)
+
+        return new_albums
+
+    def _check_artists(
+        self,
+        releases: "queue.Queue[Optional[Tuple[Dict, Dict]]]",
+        date_threshold: str,
+        cutoffs: ColdCutoffs,
+    ) -> int:
+        """Check all followed artists and queue their new (artist, album) releases
+
+        Returns the number of queued releases.
+        """
+        queued = 0
+        seen_albums = set()
+
+        # Artists are fetched concurrently, each one as soon as its page arrives
+        with ThreadPoolExecutor(max_workers=self.config.max_workers) as executor:
+            checks = [
+                (
+                    artist,
+                    executor.submit(
+                        self._artist_new_albums, artist, date_threshold, cutoffs
+                    ),
+                )
+                for artist in self.get_followed_artists()
+            ]
+            n = len(checks)
+            logger.info("Checking releases for %d followed artists...", n)
+            logger.info("=" * 50)
+
+            for i, (artist, check) in enumerate(checks, 1):
+                logger.info("\nChecking artist %d/%d: %s", i, n, artist["name"])
+                albums = check.result()
+
+                if not albums:
+                    logger.info("   No new releases found")
+                    continue
 
-        return tracks
+                logger.info("🎵 New release(s) found for %s!", artist["name"])
+                # Collaborations show up for every artist involved, keep the first
+                for album in albums:
+                    if album["id"] in seen_albums:
+                        continue
+                    seen_albums.add(album["id"])
+                    releases.put((artist, album))
+                    queued += 1
+
+        return queued
+
+    def _collect_tracks(
+        self,
+        releases: "queue.Queue[Optional[Tuple[Dict, Dict]]]",
+        track_ids: List[str],
+        release_info: ReleaseTable,
+    ) -> None:
+        """Look up the tracks of queued (artist, album) releases until None arrives
+
+        Albums are looked up in bulk, so they are collected into batches of 20.
+        """
+        seen_tracks = set()
+        batch: List[Tuple[Dict, Dict]] = []
+
+        while True:
+            release = releases.get()
+            if release is not None:
+                batch.append(release)
+            if batch and (release is None or len(batch) == 20):
+                full_albums = self.get_albums_bulk([album["id"] for _, album in batch])
+
+                for (artist, album), full_album in zip(batch, full_albums):
+                    for track in self._get_embedded_tracks(full_album):
+                        # The same track can be on several releases, keep the first
+                        if track["id"] in seen_tracks:
+                            continue
+                        seen_tracks.add(track["id"])
+                        track_ids.append(track["id"])
+                        release_info.append(
+                            artist=artist["name"],
+                            track_name=track["name"],
+                            album_name=album["name"],
+                            release_date=album["release_date"],
+                            track_url=track["external_urls"]["spotify"],
+                        )
+                batch = []
+            if release is None:
+                return
 
     def create_playlist_with_new_releases(
         self, days_threshold: int = 7
-    ) -> Tuple[List[str], List[ReleaseInfo]]:
+    ) -> Tuple[List[str], ReleaseTable]:
         """Create a playlist with new releases from followed artists"""
-        date_threshold = datetime.now() - timedelta(days=days_threshold)
-        track_ids = []
-        release_info = []
-
-        followed_artists = self.get_followed_artists()
-        logger.info(
-            f"Checking releases for {len(followed_artists)} followed artists..."
+        # Release dates are ISO strings, so the threshold is compared as one too
+        date_threshold = (date.today() - timedelta(days=days_threshold)).isoformat()
+        # Fixed once for the run, so every artist is judged by the same cutoffs
+        cutoffs = ColdCutoffs.for_run(
+            date_threshold, self.config.cold_after_days, self.config.cold_recheck_hours
         )
-        logger.info("=" * 50)
-
-        for i, artist in enumerate(followed_artists, 1):
+        track_ids: List[str] = []
+        release_info = ReleaseTable()
+        # New releases are handed to a collector thread as they are found, so
+        # their tracks are looked up while the remaining artists are checked
+        releases: "queue.Queue[Optional[Tuple[Dict, Dict]]]" = queue.Queue()
+
+        with ThreadPoolExecutor(max_workers=COLLECTOR_WORKERS) as collector:
+            collecting = collector.submit(
+                self._collect_tracks, releases, track_ids, release_info
+            )
+            try:
+                new_releases = self._check_artists(releases, date_threshold, cutoffs)
+            finally:
+                releases.put(None)  # Let the collector finish
+
+            if self.cache is not None:
+                self.cache.save()
+
+            if new_releases:
+                logger.info("\n" + "=" * 50)
+                logger.info(
+                    "Waiting for the remaining tracks of %d new releases...",
+                    new_releases,
+                )
+            collecting.result()
+
+        if release_info and logger.isEnabledFor(logging.INFO):
             logger.info(
-                f"\nChecking artist {i}/{len(followed_artists)}: {artist['name']}"
+                "\n".join(
+                    f"   → Found: {track_name} ({album_name})"
+                    for track_name, album_name in zip(
+                        release_info.track_name, release_info.album_name
+                    )
+                )
             )
-            new_releases_found = False
-
-            albums = self.get_artist_albums(artist["id"])
-
-            for album in albums:
-                try:
-                    release_date = datetime.strptime(album["release_date"], "%Y-%m-%d")
-                    if release_date >= date_threshold:
-                        if not new_releases_found:
-                            logger.info(
-                                f"🎵 New release(s) found for {artist['name']}!"
-                            )
-                            new_releases_found = True
-
-                        tracks = self.get_album_tracks(album["id"])
-                        for track in tracks:
-                            track_ids.append(track["id"])
-                            release_info.append(
-                                ReleaseInfo(
-                                    artist=artist["name"],
-                                    track_name=track["name"],
-                                    album_name=album["name"],
-                                    release_date=album["release_date"],
-                                    track_url=track["external_urls"]["spotify"],
-                                )
-                            )
-                            logger.info(
-                                f"   → Found: {track['name']} ({album['name']})"
-                            )
-                except ValueError:
-                    continue
-
-            if not new_releases_found:
-                logger.info("   No new releases found")
-
-            time.sleep(0.1)  # Rate limiting
 
         return track_ids, release_info
 
@@ -164,17 +407,17 @@ class SpotifyReleaseRadar:
             return None
 
         logger.info("\n" + "=" * 50)
-        logger.info(f"Found {len(track_ids)} new tracks! Creating playlist...")
+        logger.info("Found %d new tracks! Creating playlist...", len(track_ids))
 
-        playlist_name = f"New Releases {datetime.now().strftime('%Y-%m-%d')}"
+        today = date.today().isoformat()
+        playlist_name = f"New Releases {today}"
         playlist_description = (
             f"New releases from followed artists in the past {days_threshold} days. "
-            f"Generated on {datetime.now().strftime('%Y-%m-%d')}"
+            f"Generated on {today}"
         )
 
-        user_id = self.sp.current_user()["id"]
         playlist = self.sp.user_playlist_create(
-            user_id, playlist_name, public=True, description=playlist_description
+            self.user_id, playlist_name, public=True, description=playlist_description
         )
 
         # Add tracks in batches (Spotify's 100 track limit I believe)
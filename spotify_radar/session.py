@@ -0,0 +1,95 @@
+import threading
+import time
+
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Rate limited and transient server errors are retried, honoring Retry-After
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class SpotifyRetry(Retry):
+    """Retry that only repeats a POST when Spotify rate limited it
+
+    A 5xx after a POST does not mean the request was not applied, retrying
+    could create a playlist twice or add the same tracks again. A 429 means
+    the request was rejected, so it is safe to send again.
+    """
+
+    def is_retry(
+        self, method: str, status_code: int, has_retry_after: bool = False
+    ) -> bool:
+        if method.upper() == "POST" and status_code != 429:
+            return False
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+class RateLimiter:
+    """Token bucket allowing `rate` requests per second, shared between threads"""
+
+    def __init__(self, rate: float):
+        if rate <= 0:
+            raise ValueError(f"Request rate must be positive, got {rate}")
+        self.rate = rate
+        # Hold at least one token, or rates below 1/s could never send anything
+        self.capacity = max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a request may be sent"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class RadarSession(requests.Session):
+    """Session for spotipy that rate limits requests and retries failed ones
+
+    Responses are parsed with orjson, which is considerably faster than the
+    json module requests uses.
+    """
+
+    def __init__(
+        self,
+        requests_per_second: float,
+        retries: int,
+        backoff_factor: float,
+        pool_size: int = 10,
+    ):
+        super().__init__()
+        self.limiter = RateLimiter(requests_per_second)
+
+        retry = SpotifyRetry(
+            total=retries,
+            read=False,
+            status=retries,
+            backoff_factor=backoff_factor,
+            backoff_jitter=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(["GET", "POST", "PUT", "DELETE"]),
+            respect_retry_after_header=True,
+        )
+        # One kept-alive connection per concurrent caller, so no thread has to
+        # open (and TLS handshake) a connection that is dropped right after
+        adapter = HTTPAdapter(pool_maxsize=pool_size, max_retries=retry)
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+
+    def request(self, method, url, *args, **kwargs):
+        self.limiter.acquire()
+        response = super().request(method, url, *args, **kwargs)
+        response.json = lambda **kwargs: orjson.loads(response.content)
+        return response
@@ -0,0 +1,93 @@
+from datetime import date, datetime, timedelta
+
+from spotify_radar.cache import AlbumCache, ColdCutoffs
+
+
+def days_ago(days):
+    return (date.today() - timedelta(days=days)).isoformat()
+
+
+def hours_ago(hours):
+    return (datetime.now() - timedelta(hours=hours)).isoformat(timespec="seconds")
+
+
+def single(album_id, release_date, precision="day"):
+    return {
+        "id": album_id,
+        "name": album_id,
+        "release_date": release_date,
+        "release_date_precision": precision,
+        "album_group": "single",
+    }
+
+
+def cutoffs(threshold=None):
+    return ColdCutoffs.for_run(
+        threshold or days_ago(7), cold_after_days=180, recheck_hours=24
+    )
+
+
+def cache_with(tmp_path, albums, checked_at):
+    cache = AlbumCache(str(tmp_path / "albums.json"))
+    cache.set("artist", albums, len(albums), albums[0]["id"], days_ago(7), checked_at)
+    return cache
+
+
+def test_inactive_recently_checked_artist_is_cold(tmp_path):
+    cache = cache_with(tmp_path, [single("old", days_ago(400))], hours_ago(1))
+
+    assert cache.is_cold("artist", cutoffs())
+
+
+def test_artist_with_a_recent_release_is_not_cold(tmp_path):
+    cache = cache_with(tmp_path, [single("recent", days_ago(30))], hours_ago(1))
+
+    assert not cache.is_cold("artist", cutoffs())
+
+
+def test_artist_not_checked_for_a_day_is_not_cold(tmp_path):
+    cache = cache_with(tmp_path, [single("old", days_ago(400))], hours_ago(25))
+
+    assert not cache.is_cold("artist", cutoffs())
+
+
+def test_artist_is_not_cold_when_the_time_range_reaches_its_last_release(tmp_path):
+    cache = cache_with(tmp_path, [single("old", days_ago(400))], hours_ago(1))
+
+    assert not cache.is_cold("artist", cutoffs(threshold=days_ago(500)))
+
+
+def test_only_full_dates_count_as_last_release(tmp_path):
+    albums = [single("year", str(date.today().year), precision="year")]
+    cache = cache_with(tmp_path, albums, hours_ago(1))
+
+    assert not cache.is_cold("artist", cutoffs())
+
+
+def test_unknown_artist_is_not_cold(tmp_path):
+    assert not AlbumCache(str(tmp_path / "albums.json")).is_cold("artist", cutoffs())
+
+
+def test_cache_round_trips_through_disk(tmp_path):
+    cache = cache_with(tmp_path, [single("old", days_ago(400))], hours_ago(1))
+    cache.save()
+
+    loaded = AlbumCache(cache.path)
+
+    assert loaded.get("artist") == cache.get("artist")
+
+
+def test_unwritable_cache_is_not_fatal(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    cache = AlbumCache(str(blocker / "albums.json"))
+    cache.set("artist", [single("old", days_ago(400))], 1, "old", days_ago(7), "")
+
+    cache.save()
+
+
+def test_corrupted_cache_is_ignored(tmp_path):
+    path = tmp_path / "albums.json"
+    path.write_text("{not json")
+
+    assert AlbumCache(str(path)).entries == {}
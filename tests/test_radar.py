@@ -0,0 +1,296 @@
+import os
+from datetime import date, timedelta
+
+import pytest
+import spotipy
+
+from spotify_radar.cache import ColdCutoffs
+from spotify_radar.radar import SpotifyConfig, SpotifyReleaseRadar
+
+
+def days_ago(days):
+    return (date.today() - timedelta(days=days)).isoformat()
+
+
+def album(album_id, group, release_date, precision="day"):
+    return {
+        "id": album_id,
+        "name": album_id,
+        "release_date": release_date,
+        "release_date_precision": precision,
+        "album_group": group,
+    }
+
+
+def artist(artist_id):
+    return {"id": artist_id, "name": artist_id}
+
+
+def track(track_id):
+    return {
+        "id": track_id,
+        "name": track_id,
+        "external_urls": {"spotify": f"https://open.spotify.com/track/{track_id}"},
+    }
+
+
+class StubSpotify:
+    """Serves followed artists, their albums and album tracks in pages
+
+    Every artist has the same discography unless discographies lists their own.
+    Requests are counted and the album ids of bulk lookups recorded.
+    """
+
+    # Small enough that the embedded tracks of an album need paginating
+    TRACK_PAGE = 2
+
+    def __init__(self, discography, artists=(), discographies=None, tracks=None):
+        self.discography = discography
+        self.artists = list(artists)
+        self.discographies = discographies or {}
+        self.tracks = tracks or {}
+        self.requests = 0
+        self.album_lookups = []
+        self.checked_artists = set()
+
+    def _items(self, source):
+        kind, _, key = source.partition("/")
+        if kind == "artists":
+            return self.artists
+        if kind == "tracks":
+            return self.tracks[key]
+        return self.discographies.get(key, self.discography)
+
+    def _page(self, source, offset, limit):
+        self.requests += 1
+        items = self._items(source)
+        end = offset + limit
+        return {
+            "items": items[offset:end],
+            "next": f"{source}:{end}:{limit}" if end < len(items) else None,
+            "total": len(items),
+        }
+
+    def current_user_followed_artists(self, limit=20):
+        return {"artists": self._page("artists", 0, limit)}
+
+    def artist_albums(self, artist_id, include_groups=None, country=None, limit=20):
+        self.checked_artists.add(artist_id)
+        return self._page(f"albums/{artist_id}", 0, limit)
+
+    def albums(self, album_ids, market=None):
+        self.album_lookups.append(album_ids)
+        return {
+            "albums": [
+                {
+                    "id": album_id,
+                    "tracks": self._page(f"tracks/{album_id}", 0, self.TRACK_PAGE),
+                }
+                for album_id in album_ids
+            ]
+        }
+
+    def next(self, results):
+        source, offset, limit = results["next"].split(":")
+        page = self._page(source, int(offset), int(limit))
+        return {"artists": page} if source == "artists" else page
+
+
+@pytest.fixture
+def radar(tmp_path):
+    config = SpotifyConfig(
+        client_id="id",
+        client_secret="secret",
+        redirect_uri="http://127.0.0.1:8888/callback",
+        cache_path=str(tmp_path / "albums.json"),
+    )
+    return SpotifyReleaseRadar(config)
+
+
+def discography(albums=60, singles=60):
+    """Old albums first, then singles newest first, like Spotify lists them"""
+    return [album(f"album{i}", "album", days_ago(1000 + i)) for i in range(albums)] + [
+        album(f"single{i}", "single", days_ago(1 + i * 10)) for i in range(singles)
+    ]
+
+
+def cutoffs_for(threshold):
+    return ColdCutoffs.for_run(threshold, cold_after_days=180, recheck_hours=24)
+
+
+def test_is_past_min_date_only_stops_on_old_singles():
+    threshold = days_ago(7)
+    is_past = SpotifyReleaseRadar._is_past_min_date
+
+    # Old albums are followed by the singles group, which may still be new
+    assert not is_past([album("a", "album", days_ago(100))], threshold)
+    assert is_past([album("s", "single", days_ago(100))], threshold)
+    assert not is_past([album("s", "single", days_ago(1))], threshold)
+    assert not is_past([album("s", "single", "2001", precision="year")], threshold)
+    assert not is_past([album("s", "single", days_ago(100))], None)
+
+
+def test_get_artist_albums_stops_paginating_after_old_singles(radar):
+    radar.sp = StubSpotify(discography())
+    threshold = days_ago(7)
+
+    albums = list(radar.get_artist_albums("artist", min_date=threshold))
+
+    # Page 2 ends with a single from long ago, page 3 is never requested
+    assert radar.sp.requests == 2
+    assert [a["id"] for a in albums if a["release_date"] >= threshold] == ["single0"]
+
+
+def test_get_artist_albums_without_min_date_fetches_everything(radar):
+    radar.sp = StubSpotify(discography())
+
+    assert len(list(radar.get_artist_albums("artist"))) == 120
+    assert radar.sp.requests == 3
+
+
+def test_cached_albums_are_reused_while_nothing_changed(radar):
+    radar.sp = StubSpotify(discography())
+    threshold = days_ago(7)
+
+    first = radar._get_cached_artist_albums("artist", threshold, cutoffs_for(threshold))
+    radar.sp.requests = 0
+    second = radar._get_cached_artist_albums(
+        "artist", threshold, cutoffs_for(threshold)
+    )
+
+    assert [a["id"] for a in second] == [a["id"] for a in first]
+    assert radar.sp.requests == 1  # Only the one-album probe
+
+
+def test_cached_albums_are_refetched_when_a_release_was_added(radar):
+    radar.sp = StubSpotify(discography())
+    threshold = days_ago(7)
+    radar._get_cached_artist_albums("artist", threshold, cutoffs_for(threshold))
+
+    # Newest single, right after the 60 albums
+    radar.sp.discography.insert(60, album("new", "single", days_ago(0)))
+    radar.sp.requests = 0
+    albums = radar._get_cached_artist_albums(
+        "artist", threshold, cutoffs_for(threshold)
+    )
+
+    assert radar.sp.requests > 1
+    assert "new" in [a["id"] for a in albums]
+
+
+def test_cached_albums_are_refetched_when_the_first_album_changed(radar):
+    radar.sp = StubSpotify(discography())
+    threshold = days_ago(7)
+    radar._get_cached_artist_albums("artist", threshold, cutoffs_for(threshold))
+
+    # Same count, but a different album leads the list
+    radar.sp.discography[0] = album("replacement", "album", days_ago(2))
+    albums = radar._get_cached_artist_albums(
+        "artist", threshold, cutoffs_for(threshold)
+    )
+
+    assert "replacement" in [a["id"] for a in albums]
+
+
+def test_cached_albums_are_refetched_for_a_longer_time_range(radar):
+    radar.sp = StubSpotify(discography())
+    threshold = days_ago(7)
+    radar._get_cached_artist_albums("artist", threshold, cutoffs_for(threshold))
+
+    longer = days_ago(300)
+    radar.sp.requests = 0
+    albums = radar._get_cached_artist_albums("artist", longer, cutoffs_for(longer))
+
+    assert radar.sp.requests > 1
+    assert len([a for a in albums if a["release_date"] >= longer]) == 30
+
+
+def test_cold_artists_are_not_requested(radar):
+    radar.sp = StubSpotify([album("old", "single", days_ago(400))])
+    threshold = days_ago(7)
+    radar._get_cached_artist_albums("artist", threshold, cutoffs_for(threshold))
+
+    radar.sp.requests = 0
+    albums = radar._get_cached_artist_albums(
+        "artist", threshold, cutoffs_for(threshold)
+    )
+
+    assert albums == []
+    assert radar.sp.requests == 0
+
+
+def test_new_releases_are_looked_up_in_batches_of_20_in_artist_order(radar):
+    artists = [artist(f"artist{i}") for i in range(25)]
+    radar.sp = StubSpotify(
+        [],
+        artists=artists,
+        discographies={
+            a["id"]: [album(f"{a['id']}-single", "single", days_ago(1))]
+            for a in artists
+        },
+        tracks={f"{a['id']}-single": [track(f"{a['id']}-track")] for a in artists},
+    )
+
+    track_ids, release_info = radar.create_playlist_with_new_releases(7)
+
+    assert [len(lookup) for lookup in radar.sp.album_lookups] == [20, 5]
+    assert track_ids == [f"artist{i}-track" for i in range(25)]
+    assert release_info.artist == [a["id"] for a in artists]
+
+
+def test_collaborations_and_shared_tracks_are_only_added_once(radar):
+    collab = album("collab", "single", days_ago(1))
+    radar.sp = StubSpotify(
+        [],
+        artists=[artist("a"), artist("b")],
+        discographies={
+            "a": [collab],
+            "b": [collab, album("b-single", "single", days_ago(2))],
+        },
+        tracks={
+            "collab": [track("t1"), track("t2")],
+            "b-single": [track("t2"), track("t3")],
+        },
+    )
+
+    track_ids, release_info = radar.create_playlist_with_new_releases(7)
+
+    assert radar.sp.album_lookups == [["collab", "b-single"]]
+    assert track_ids == ["t1", "t2", "t3"]
+    assert release_info.artist == ["a", "a", "b"]
+
+
+def test_long_albums_are_paginated(radar):
+    radar.sp = StubSpotify(
+        [album("long", "album", days_ago(1))],
+        artists=[artist("a")],
+        tracks={"long": [track(f"t{i}") for i in range(5)]},
+    )
+
+    track_ids, _ = radar.create_playlist_with_new_releases(7)
+
+    assert track_ids == [f"t{i}" for i in range(5)]
+
+
+def test_collector_errors_are_raised_once_all_artists_were_checked(radar):
+    artists = [artist(f"artist{i}") for i in range(25)]
+    radar.sp = StubSpotify(
+        [],
+        artists=artists,
+        discographies={
+            a["id"]: [album(f"{a['id']}-single", "single", days_ago(1))]
+            for a in artists
+        },
+    )
+
+    def failing_lookup(album_ids, market=None):
+        raise spotipy.SpotifyException(500, -1, "lookup failed")
+
+    radar.sp.albums = failing_lookup
+
+    # The first batch fails while the artists are still being checked
+    with pytest.raises(spotipy.SpotifyException):
+        radar.create_playlist_with_new_releases(7)
+
+    assert radar.sp.checked_artists == {a["id"] for a in artists}
+    assert os.path.exists(radar.cache.path)
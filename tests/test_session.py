@@ -0,0 +1,61 @@
+import threading
+import time
+
+import pytest
+
+from spotify_radar.session import RadarSession, RateLimiter, SpotifyRetry
+
+
+def test_rate_limiter_allows_a_burst_up_to_the_rate():
+    limiter = RateLimiter(50)
+
+    start = time.monotonic()
+    for _ in range(50):
+        limiter.acquire()
+
+    assert time.monotonic() - start < 0.5
+
+
+def test_rate_limiter_spaces_requests_beyond_the_burst():
+    limiter = RateLimiter(20)
+    for _ in range(20):
+        limiter.acquire()
+
+    start = time.monotonic()
+    for _ in range(4):
+        limiter.acquire()
+
+    assert time.monotonic() - start >= 0.15
+
+
+def test_rate_limiter_below_one_request_per_second_still_sends():
+    limiter = RateLimiter(0.5)
+    done = threading.Event()
+
+    threading.Thread(
+        target=lambda: (limiter.acquire(), done.set()), daemon=True
+    ).start()
+
+    assert done.wait(1)
+
+
+@pytest.mark.parametrize("rate", [0, -1])
+def test_non_positive_rates_are_rejected(rate):
+    with pytest.raises(ValueError):
+        RateLimiter(rate)
+    with pytest.raises(ValueError):
+        RadarSession(requests_per_second=rate, retries=3, backoff_factor=1.0)
+
+
+def test_post_is_only_retried_when_rate_limited():
+    retry = (
+        RadarSession(requests_per_second=10, retries=3, backoff_factor=1.0)
+        .adapters["https://"]
+        .max_retries
+    )
+
+    assert isinstance(retry, SpotifyRetry)
+    assert retry.is_retry("POST", 429)
+    assert not retry.is_retry("POST", 502)
+    assert retry.is_retry("GET", 502)
+    assert retry.is_retry("GET", 429)